@@ -0,0 +1,72 @@
+"""
+Persistent on-disk cache for LLM responses
+Keyed by SHA-256 of (model, prompt, max_tokens) so repeated runs with the
+same inputs skip the network round trip entirely.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+# Override with ONEDAYAPP_LLM_CACHE to share one cache across working
+# directories, so batch runs of the agent dedupe identical prompts
+CACHE_DIR = Path(os.environ.get("ONEDAYAPP_LLM_CACHE", ".llm_cache"))
+
+
+def _cache_key(model: str, prompt: str, max_tokens: int = None) -> str:
+    """Build a stable content-addressed key for one generation request"""
+    payload = f"{model}\x00{prompt}\x00{max_tokens}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_cached(model: str, prompt: str, max_tokens: int = None):
+    """Return the cached response text for this request, or None on miss"""
+    path = CACHE_DIR / f"{_cache_key(model, prompt, max_tokens)}.json"
+    if not path.is_file():
+        return None
+    try:
+        return json.loads(path.read_text())["response"]
+    except (json.JSONDecodeError, KeyError, OSError):
+        return None
+
+
+def store(model: str, prompt: str, response: str, max_tokens: int = None):
+    """Persist a response so identical future requests hit the cache"""
+    CACHE_DIR.mkdir(exist_ok=True)
+    path = CACHE_DIR / f"{_cache_key(model, prompt, max_tokens)}.json"
+    payload = json.dumps({
+        "model": model,
+        "max_tokens": max_tokens,
+        "response": response,
+    })
+    # Skip the write when an identical entry is already on disk, and go
+    # through a temp file + rename so readers never see a partial entry
+    if path.is_file():
+        try:
+            if path.read_text() == payload:
+                return
+        except OSError:
+            pass
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(payload)
+    os.replace(tmp_path, path)
+
+
+def invoke_cached(llm, messages) -> str:
+    """
+    Invoke a LangChain chat model with caching.
+    Returns the response content string, serving it from disk when the
+    same (model, messages) pair was seen before.
+    """
+    model = getattr(llm, "model_name", "") or getattr(llm, "model", "")
+    prompt = "\x00".join(m.content for m in messages)
+    cached = get_cached(model, prompt)
+    if cached is not None:
+        return cached
+    # Stream tokens as they arrive instead of blocking on the complete
+    # response: decoding overlaps generation, so the last token lands and
+    # the joined string is ready with no tail-end wait
+    content = "".join(chunk.content for chunk in llm.stream(messages))
+    store(model, prompt, content)
+    return content
@@ -8,8 +8,33 @@ from typing import TypedDict, Annotated, List, Dict, Any
 from langgraph.graph import StateGraph, END
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
+import asyncio
+import httpx
 import json
 import operator
+import sys
+
+from functools import lru_cache
+
+from llm_cache import invoke_cached
+
+# orjson parses and serializes several times faster than the stdlib json;
+# fall back transparently when it is not installed
+try:
+    import orjson
+
+    def json_loads(s):
+        return orjson.loads(s)
+
+    def json_dumps(obj, indent=False):
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(obj, option=option).decode()
+except ImportError:
+    def json_loads(s):
+        return json.loads(s)
+
+    def json_dumps(obj, indent=False):
+        return json.dumps(obj, indent=2 if indent else None)
 
 # Define the state structure
 class AgentState(TypedDict):
@@ -19,76 +44,49 @@ class AgentState(TypedDict):
     selected_theme: Dict[str, Any]
     user_preferences: str
     final_prompt: Dict[str, Any]
+    quiet: bool
     messages: Annotated[List, operator.add]
 
+# Shared HTTP client with keep-alive so sequential calls reuse one
+# TCP/TLS connection instead of re-handshaking per request
+http_client = httpx.Client(
+    limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
+)
+
+# Every node expects machine-readable JSON back, so force JSON mode (no
+# markdown fences or prose to strip) and cap the output tokens: the model
+# stops at the closing brace instead of rambling to the context limit
+JSON_MODE = {"response_format": {"type": "json_object"}}
+
 # Initialize LLM
-llm = ChatOpenAI(model="gpt-4-turbo-preview", temperature=0.7,api_key="YOUR_OPENAI_API_KEY")
+llm = ChatOpenAI(model="gpt-4-turbo-preview", temperature=0.7,api_key="YOUR_OPENAI_API_KEY", http_client=http_client, max_tokens=4000, model_kwargs=JSON_MODE)
 
-# Node 1: Search for similar apps
-def search_similar_apps(state: AgentState) -> AgentState:
-    """Search for similar mobile apps based on user input"""
-    user_input = state['user_input']
-    
-    prompt = f"""
-    Based on this app request: "{user_input}"
-    
-    Research and list 5 similar successful mobile apps. For each app, provide:
+# Deterministic client for the final-spec step: it restructures the already
+# selected theme rather than inventing new content, so temperature=0 keeps
+# the output stable and maximizes cache hits across runs
+spec_llm = ChatOpenAI(model="gpt-4-turbo-preview", temperature=0.0, api_key="YOUR_OPENAI_API_KEY", http_client=http_client, max_tokens=4000, model_kwargs=JSON_MODE)
+
+# Prompt templates built once at import time instead of per call.
+# Static instructions come first, dynamic data last: providers cache shared
+# prompt prefixes, so the variable part should sit at the end.
+RESEARCH_AND_THEMES_PROMPT = sys.intern("""
+    Complete BOTH tasks below in a single response.
+
+    TASK 1 - Research: identify 5 similar successful mobile apps. For each app, provide:
     - App name
     - Key design characteristics
     - Color scheme
     - Layout approach
     - Typography style
     - Unique design elements
-    
-    Format as JSON array with these fields for each app.
-    """
-    
-    messages = [
-        SystemMessage(content="You are a UX/UI research expert specializing in mobile app design analysis."),
-        HumanMessage(content=prompt)
-    ]
-    
-    response = llm.invoke(messages)
-    
-    # Parse the response to extract similar apps
-    try:
-        similar_apps = json.loads(response.content)
-    except:
-        # Fallback if JSON parsing fails
-        similar_apps = [
-            {
-                "app_name": "Example App 1",
-                "design_characteristics": "Modern, minimalist",
-                "color_scheme": ["#FF6B6B", "#4ECDC4"],
-                "layout": "Card-based",
-                "typography": "Sans-serif, clean"
-            }
-        ]
-    
-    state['similar_apps'] = similar_apps
-    state['messages'].append(f"✅ Found {len(similar_apps)} similar apps")
-    
-    return state
 
-# Node 2: Analyze and create design themes
-def create_design_themes(state: AgentState) -> AgentState:
-    """Analyze similar apps and generate 2 distinct design themes"""
-    similar_apps = state['similar_apps']
-    user_input = state['user_input']
-    
-    prompt = f"""
-    Based on the user's request for: "{user_input}"
-    
-    And analysis of these similar apps:
-    {json.dumps(similar_apps, indent=2)}
-    
-    Create 2 DISTINCT design themes. For each theme provide:
-    
-    1. **Layout Types**: 
+    TASK 2 - Design: based on your Task 1 analysis, create 2 DISTINCT design themes. For each theme provide:
+
+    1. **Layout Types**:
        - Primary layout structure (e.g., Card-based, List-based, Grid, Tab-based)
        - Navigation pattern (e.g., Bottom nav, Side drawer, Top tabs)
        - Screen hierarchy approach
-    
+
     2. **Identity Color Palettes**:
        - Primary color (hex code)
        - Secondary color (hex code)
@@ -96,20 +94,20 @@ def create_design_themes(state: AgentState) -> AgentState:
        - Background colors (2-3 variations)
        - Text colors (primary, secondary)
        - Color psychology reasoning
-    
+
     3. **Identity Typography**:
        - Heading font family
        - Body font family
        - Font size scale (h1, h2, h3, body, caption)
        - Font weights used
        - Line height recommendations
-    
+
     4. **Spacing Scales**:
        - Base unit (e.g., 4px, 8px)
        - Spacing scale (xs, sm, md, lg, xl, 2xl)
        - Padding system
        - Margin system
-    
+
     5. **Component Styles**:
        - Button styles (primary, secondary, tertiary)
        - Input field styles
@@ -117,128 +115,198 @@ def create_design_themes(state: AgentState) -> AgentState:
        - Icon style approach
        - Border radius system
        - Shadow/elevation system
-    
+
     6. **Imagery Style**:
        - Photography style (if applicable)
        - Illustration style
        - Icon style (outlined, filled, etc.)
        - Image treatment (filters, overlays)
-    
+
     Make Theme 1 more modern/bold and Theme 2 more classic/elegant.
-    Return as JSON with structure: {{"themes": [theme1, theme2]}}
-    """
-    
+
+    Return ONE JSON object with the results of both tasks:
+    {{"similar_apps": [app1, ..., app5], "themes": [theme1, theme2]}}
+
+    App request: "{user_input}"
+    """)
+
+FINAL_PROMPT = sys.intern("""
+    Generate a complete, implementation-ready design specification in JSON format with ALL details.
+    Include specific measurements, exact hex codes, font sizes, spacing values, etc.
+
+    The app to specify: "{user_input}"
+
+    The selected theme:
+    {selected_theme_json}
+
+    User preferences: "{preferences}"
+    """)
+
+# Fallback data built once at import time instead of inside the except
+# branches on every failed parse.
+FALLBACK_SIMILAR_APPS = [
+    {
+        "app_name": "Example App 1",
+        "design_characteristics": "Modern, minimalist",
+        "color_scheme": ["#FF6B6B", "#4ECDC4"],
+        "layout": "Card-based",
+        "typography": "Sans-serif, clean"
+    }
+]
+
+FALLBACK_THEMES = [
+    {
+        "theme_name": "Modern Bold",
+        "layout_types": {
+            "primary_structure": "Card-based with prominent imagery",
+            "navigation": "Bottom navigation with floating action button",
+            "hierarchy": "Clear visual hierarchy with generous whitespace"
+        },
+        "color_palette": {
+            "primary": "#FF6B6B",
+            "secondary": "#4ECDC4",
+            "accent": "#FFE66D",
+            "background": ["#FFFFFF", "#F7F7F7"],
+            "text": ["#2D3436", "#636E72"]
+        }
+    },
+    {
+        "theme_name": "Classic Elegant",
+        "layout_types": {
+            "primary_structure": "List-based with subtle cards",
+            "navigation": "Side drawer with top app bar",
+            "hierarchy": "Traditional hierarchy with clear sections"
+        },
+        "color_palette": {
+            "primary": "#2C3E50",
+            "secondary": "#E8B4B8",
+            "accent": "#95A5A6",
+            "background": ["#FFFFFF", "#FAFAFA"],
+            "text": ["#2C3E50", "#7F8C8D"]
+        }
+    }
+]
+
+# Node 1: Research similar apps and create design themes in one LLM call.
+# The two steps used to be separate calls, but nothing happens between them,
+# so batching them into one request halves the round trips for this phase.
+def research_and_create_themes(state: AgentState) -> Dict[str, Any]:
+    """Search for similar mobile apps and generate 2 distinct design themes"""
+    user_input = state['user_input']
+
+    prompt = RESEARCH_AND_THEMES_PROMPT.format_map({'user_input': user_input})
+
     messages = [
-        SystemMessage(content="You are an expert UI/UX designer who creates comprehensive design systems."),
+        SystemMessage(content="You are a UX/UI expert who researches mobile app design and creates comprehensive design systems."),
         HumanMessage(content=prompt)
     ]
-    
-    response = llm.invoke(messages)
-    
-    # Parse themes
+
+    content = invoke_cached(llm, messages)
+
+    # Parse both task results from the single response
     try:
-        themes_data = json.loads(response.content)
-        design_themes = themes_data.get('themes', [])
+        data = json_loads(content)
+        similar_apps = data.get('similar_apps', [])
+        design_themes = data.get('themes', [])
     except:
-        # Fallback themes
-        design_themes = [
-            {
-                "theme_name": "Modern Bold",
-                "layout_types": {
-                    "primary_structure": "Card-based with prominent imagery",
-                    "navigation": "Bottom navigation with floating action button",
-                    "hierarchy": "Clear visual hierarchy with generous whitespace"
-                },
-                "color_palette": {
-                    "primary": "#FF6B6B",
-                    "secondary": "#4ECDC4",
-                    "accent": "#FFE66D",
-                    "background": ["#FFFFFF", "#F7F7F7"],
-                    "text": ["#2D3436", "#636E72"]
-                }
-            },
-            {
-                "theme_name": "Classic Elegant",
-                "layout_types": {
-                    "primary_structure": "List-based with subtle cards",
-                    "navigation": "Side drawer with top app bar",
-                    "hierarchy": "Traditional hierarchy with clear sections"
-                },
-                "color_palette": {
-                    "primary": "#2C3E50",
-                    "secondary": "#E8B4B8",
-                    "accent": "#95A5A6",
-                    "background": ["#FFFFFF", "#FAFAFA"],
-                    "text": ["#2C3E50", "#7F8C8D"]
-                }
-            }
+        # Fallback if JSON parsing fails
+        similar_apps = FALLBACK_SIMILAR_APPS
+        design_themes = FALLBACK_THEMES
+
+    if not similar_apps:
+        similar_apps = FALLBACK_SIMILAR_APPS
+    if not design_themes:
+        design_themes = FALLBACK_THEMES
+
+    # Return only the delta: the operator.add reducer merges the short
+    # message list instead of re-adding the full history each step
+    return {
+        'similar_apps': similar_apps,
+        'design_themes': design_themes,
+        'messages': [
+            f"✅ Found {len(similar_apps)} similar apps",
+            f"✅ Created {len(design_themes)} design themes"
         ]
-    
-    state['design_themes'] = design_themes
-    state['messages'].append(f"✅ Created {len(design_themes)} design themes")
-    
-    return state
+    }
+
+# Character translation table built once; translate() runs at C level
+_UNDERSCORE_TO_SPACE = str.maketrans('_', ' ')
+
+@lru_cache(maxsize=None)
+def _indent_prefix(depth: int) -> str:
+    """Tree prefixes recur for every row at a depth; build each once"""
+    return "|   " * depth
+
+@lru_cache(maxsize=256)
+def _label(key: str) -> str:
+    """Snake_case key to display label; memoized since the same few theme
+    keys recur for every theme"""
+    return key.translate(_UNDERSCORE_TO_SPACE).title()
 
 # Node 3: Present themes to user
-def present_themes(state: AgentState) -> AgentState:
+def present_themes(state: AgentState) -> Dict[str, Any]:
     """Format and present the two themes to the user"""
     themes = state['design_themes']
-    
-    presentation = "\n\n" + "="*60 + "\n"
-    presentation += "🎨 DESIGN THEME OPTIONS\n"
-    presentation += "="*60 + "\n\n"
-    
+
+    # Presentation text is write-only in quiet (batch) runs; skip building it
+    if state.get('quiet'):
+        return {'messages': []}
+
+    # Collect lines and join once instead of quadratic str +=
+    parts = ["\n\n" + "="*60 + "\n"]
+    parts.append("🎨 DESIGN THEME OPTIONS\n")
+    parts.append("="*60 + "\n\n")
+
     for idx, theme in enumerate(themes, 1):
-        presentation += f"{'#'*60}\n"
-        presentation += f"# THEME {idx}: {theme.get('theme_name', f'Theme {idx}')}\n"
-        presentation += f"{'#'*60}\n\n"
-        
+        parts.append(f"{'#'*60}\n")
+        parts.append(f"# THEME {idx}: {theme.get('theme_name', f'Theme {idx}')}\n")
+        parts.append(f"{'#'*60}\n\n")
+
         # Layout
-        presentation += f"## 📐 Layout Types\n"
+        parts.append(f"## 📐 Layout Types\n")
         layout = theme.get('layout_types', {})
         for key, value in layout.items():
-            presentation += f"| {key.replace('_', ' ').title():<25} | {value}\n"
-        
+            parts.append(f"| {_label(key):<25} | {value}\n")
+
         # Colors
-        presentation += f"\n## 🎨 Color Palette\n"
+        parts.append(f"\n## 🎨 Color Palette\n")
         colors = theme.get('color_palette', {})
         for key, value in colors.items():
             if isinstance(value, list):
-                presentation += f"| {key.replace('_', ' ').title():<25} | {', '.join(value)}\n"
+                parts.append(f"| {_label(key):<25} | {', '.join(value)}\n")
             else:
-                presentation += f"| {key.replace('_', ' ').title():<25} | {value}\n"
-        
+                parts.append(f"| {_label(key):<25} | {value}\n")
+
         # Typography
-        presentation += f"\n## 🔤 Typography\n"
+        parts.append(f"\n## 🔤 Typography\n")
         typo = theme.get('typography', {})
         for key, value in typo.items():
-            presentation += f"| {key.replace('_', ' ').title():<25} | {value}\n"
-        
+            parts.append(f"| {_label(key):<25} | {value}\n")
+
         # Spacing
-        presentation += f"\n## 📏 Spacing Scale\n"
+        parts.append(f"\n## 📏 Spacing Scale\n")
         spacing = theme.get('spacing', {})
         for key, value in spacing.items():
-            presentation += f"| {key.replace('_', ' ').title():<25} | {value}\n"
-        
+            parts.append(f"| {_label(key):<25} | {value}\n")
+
         # Components
-        presentation += f"\n## 🧩 Component Styles\n"
+        parts.append(f"\n## 🧩 Component Styles\n")
         components = theme.get('components', {})
         for key, value in components.items():
-            presentation += f"| {key.replace('_', ' ').title():<25} | {value}\n"
-        
+            parts.append(f"| {_label(key):<25} | {value}\n")
+
         # Imagery
-        presentation += f"\n## 🖼️ Imagery Style\n"
+        parts.append(f"\n## 🖼️ Imagery Style\n")
         imagery = theme.get('imagery', {})
         for key, value in imagery.items():
-            presentation += f"| {key.replace('_', ' ').title():<25} | {value}\n"
-        
-        presentation += f"\n{'='*60}\n\n"
-    
-    state['messages'].append(presentation)
-    return state
+            parts.append(f"| {_label(key):<25} | {value}\n")
+
+        parts.append(f"\n{'='*60}\n\n")
+
+    return {'messages': ["".join(parts)]}
 
 # Node 4: Get user selection and preferences
-def get_user_selection(state: AgentState) -> AgentState:
+def get_user_selection(state: AgentState) -> Dict[str, Any]:
     """
     This function would normally wait for user input.
     In production, this would be interactive.
@@ -246,41 +314,35 @@ def get_user_selection(state: AgentState) -> AgentState:
     """
     # In a real implementation, you'd pause here and wait for user input
     # For now, we'll simulate selecting theme 1 with some preferences
-    
-    state['selected_theme'] = state['design_themes'][0]
-    state['user_preferences'] = "Make it more vibrant with playful animations"
-    state['messages'].append("✅ User selected Theme 1 with preferences")
-    
-    return state
+
+    return {
+        'selected_theme': state['design_themes'][0],
+        'user_preferences': "Make it more vibrant with playful animations",
+        'messages': ["✅ User selected Theme 1 with preferences"]
+    }
 
 # Node 5: Generate final prompt
-def generate_final_prompt(state: AgentState) -> AgentState:
+def generate_final_prompt(state: AgentState) -> Dict[str, Any]:
     """Generate the final design prompt incorporating user preferences"""
     selected_theme = state['selected_theme']
     preferences = state['user_preferences']
     user_input = state['user_input']
     
-    prompt = f"""
-    Create a comprehensive final design specification for: "{user_input}"
-    
-    Based on the selected theme:
-    {json.dumps(selected_theme, indent=2)}
-    
-    And user preferences: "{preferences}"
-    
-    Generate a complete, implementation-ready design specification in JSON format with ALL details.
-    Include specific measurements, exact hex codes, font sizes, spacing values, etc.
-    """
+    prompt = FINAL_PROMPT.format_map({
+        'user_input': user_input,
+        'selected_theme_json': json_dumps(selected_theme, indent=True),
+        'preferences': preferences
+    })
     
     messages = [
         SystemMessage(content="You are a design system architect creating production-ready specifications."),
         HumanMessage(content=prompt)
     ]
-    
-    response = llm.invoke(messages)
-    
+
+    content = invoke_cached(spec_llm, messages)
+
     try:
-        final_prompt = json.loads(response.content)
+        final_prompt = json_loads(content)
     except:
         final_prompt = {
             "app_name": user_input,
@@ -289,37 +351,49 @@ def generate_final_prompt(state: AgentState) -> AgentState:
             "status": "Design specification ready"
         }
     
-    state['final_prompt'] = final_prompt
-    state['messages'].append("✅ Final design specification generated")
-    
-    return state
+    return {
+        'final_prompt': final_prompt,
+        'messages': ["✅ Final design specification generated"]
+    }
 
 # Node 6: Present final JSON
-def present_final_json(state: AgentState) -> AgentState:
+def present_final_json(state: AgentState) -> Dict[str, Any]:
     """Present the final JSON in a formatted way using | and #"""
     final = state['final_prompt']
-    
+
+    # Same as present_themes: nobody reads the pretty output in batch runs
+    if state.get('quiet'):
+        return {'messages': []}
+
     output = "\n\n" + "#"*80 + "\n"
     output += "# 🎯 FINAL DESIGN SPECIFICATION\n"
     output += "#"*80 + "\n\n"
     
-    def format_dict(d, indent=0):
-        result = ""
-        for key, value in d.items():
-            prefix = "|   " * indent
-            if isinstance(value, dict):
-                result += f"{prefix}| {key}:\n"
-                result += format_dict(value, indent + 1)
+    def format_dict(d):
+        # Iterative walk with an explicit stack: no recursion depth limit,
+        # and lines are joined once instead of growing a string per step
+        parts = []
+        stack = [('entry', key, value, 0) for key, value in reversed(list(d.items()))]
+        while stack:
+            kind, key, value, depth = stack.pop()
+            prefix = _indent_prefix(depth)
+            if kind == 'bullet':
+                parts.append(f"{prefix}|   | • {value}\n")
+            elif isinstance(value, dict):
+                parts.append(f"{prefix}| {key}:\n")
+                stack.extend(('entry', k, v, depth + 1) for k, v in reversed(list(value.items())))
             elif isinstance(value, list):
-                result += f"{prefix}| {key}:\n"
-                for item in value:
-                    if isinstance(item, dict):
-                        result += format_dict(item, indent + 1)
-                    else:
-                        result += f"{prefix}|   | • {item}\n"
+                parts.append(f"{prefix}| {key}:\n")
+                # Lists are homogeneous in practice (all dicts or all
+                # scalars), so decide once and skip the per-item check
+                if value and all(isinstance(item, dict) for item in value):
+                    for item in reversed(value):
+                        stack.extend(('entry', k, v, depth + 1) for k, v in reversed(list(item.items())))
+                else:
+                    stack.extend(('bullet', None, item, depth) for item in reversed(value))
             else:
-                result += f"{prefix}| {key:<30} | {value}\n"
-        return result
+                parts.append(f"{prefix}| {key:<30} | {value}\n")
+        return "".join(parts)
     
     output += format_dict(final)
     output += "\n" + "#"*80 + "\n"
@@ -327,11 +401,10 @@ def present_final_json(state: AgentState) -> AgentState:
     # Also add raw JSON
     output += "\n## Raw JSON:\n"
     output += "```json\n"
-    output += json.dumps(final, indent=2)
+    output += json_dumps(final, indent=True)
     output += "\n```\n"
-    
-    state['messages'].append(output)
-    return state
+
+    return {'messages': [output]}
 
 # Build the graph
 def create_design_agent():
@@ -340,17 +413,15 @@ def create_design_agent():
     workflow = StateGraph(AgentState)
     
     # Add nodes
-    workflow.add_node("search_apps", search_similar_apps)
-    workflow.add_node("create_themes", create_design_themes)
+    workflow.add_node("research_themes", research_and_create_themes)
     workflow.add_node("present_themes", present_themes)
     workflow.add_node("get_selection", get_user_selection)
     workflow.add_node("generate_final", generate_final_prompt)
     workflow.add_node("present_json", present_final_json)
-    
+
     # Add edges
-    workflow.set_entry_point("search_apps")
-    workflow.add_edge("search_apps", "create_themes")
-    workflow.add_edge("create_themes", "present_themes")
+    workflow.set_entry_point("research_themes")
+    workflow.add_edge("research_themes", "present_themes")
     workflow.add_edge("present_themes", "get_selection")
     workflow.add_edge("get_selection", "generate_final")
     workflow.add_edge("generate_final", "present_json")
@@ -358,27 +429,72 @@ def create_design_agent():
     
     return workflow.compile()
 
-# Main execution
-if __name__ == "__main__":
-    # Create the agent
-    agent = create_design_agent()
-    
-    # Initial state
-    initial_state = {
-        "user_input": "Build a food delivery app",
+async def run_agent(agent, initial_state):
+    """Run the compiled workflow on the asyncio event loop"""
+    return await agent.ainvoke(initial_state)
+
+def make_initial_state(user_input: str, quiet: bool = False) -> AgentState:
+    """Build a fresh initial state for one workflow run"""
+    return {
+        "user_input": user_input,
         "similar_apps": [],
         "design_themes": [],
         "selected_theme": {},
         "user_preferences": "",
         "final_prompt": {},
+        "quiet": quiet,
         "messages": []
     }
+
+async def run_batch(agent, user_inputs, checkpoint_path="runs.ndjson"):
+    """
+    Run the workflow over several inputs with NDJSON checkpointing.
+
+    Each completed run is appended to checkpoint_path as one JSON line,
+    and inputs already present in the file are skipped on restart, so an
+    interrupted batch resumes where it stopped instead of re-paying for
+    finished generations.
+    """
+    completed = set()
+    try:
+        with open(checkpoint_path) as f:
+            for line in f:
+                try:
+                    completed.add(json_loads(line)['user_input'])
+                except Exception:
+                    continue  # a torn trailing line from a crash is ignored
+    except FileNotFoundError:
+        pass
+
+    results = []
+    with open(checkpoint_path, 'a') as f:
+        for user_input in user_inputs:
+            if user_input in completed:
+                continue
+            # quiet=True: only final_prompt is persisted, so the presentation
+            # nodes skip their formatting work entirely
+            final_state = await agent.ainvoke(make_initial_state(user_input, quiet=True))
+            f.write(json_dumps({
+                'user_input': user_input,
+                'final_prompt': final_state['final_prompt']
+            }) + "\n")
+            f.flush()
+            results.append(final_state)
+    return results
+
+# Main execution
+if __name__ == "__main__":
+    # Create the agent
+    agent = create_design_agent()
     
+    # Initial state
+    initial_state = make_initial_state("Build a food delivery app")
+
     # Run the agent
     print("🚀 Starting Design Theme Generation Agent...")
     print("="*60)
     
-    final_state = agent.invoke(initial_state)
+    final_state = asyncio.run(run_agent(agent, initial_state))
     
     # Print all messages
     for message in final_state['messages']:
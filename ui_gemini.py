@@ -258,16 +258,21 @@ class AgentState(TypedDict):
 # ============================================================================
 
 THEME_PY = """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from typing import List, Dict, Optional
 
-class LayoutTypes(BaseModel):
+class FrozenModel(BaseModel):
+    \"\"\"Shared base: themes are read-only once parsed, so freezing skips
+    the per-assignment validation machinery and makes instances hashable\"\"\"
+    model_config = ConfigDict(frozen=True, validate_assignment=False)
+
+class LayoutTypes(FrozenModel):
     \"\"\"Layout structure definitions\"\"\"
     primary_structure: str = Field(description="Main layout pattern")
     navigation: str = Field(description="Navigation style")
     hierarchy: str = Field(description="Visual hierarchy approach")
 
-class ColorPalette(BaseModel):
+class ColorPalette(FrozenModel):
     \"\"\"Color palette with reasoning\"\"\"
     primary: str = Field(description="Primary brand color (hex)")
     secondary: str = Field(description="Secondary color (hex)")
@@ -276,7 +281,7 @@ class ColorPalette(BaseModel):
     text: List[str] = Field(description="Text colors")
     reasoning: Optional[str] = Field(default=None, description="Color psychology")
 
-class Typography(BaseModel):
+class Typography(FrozenModel):
     \"\"\"Typography system\"\"\"
     heading_font: str = Field(description="Font for headings")
     body_font: str = Field(description="Font for body text")
@@ -284,14 +289,14 @@ class Typography(BaseModel):
     font_weights: Dict[str, int] = Field(description="Weight scale")
     line_heights: Dict[str, str] = Field(description="Line height values")
 
-class SpacingScale(BaseModel):
+class SpacingScale(FrozenModel):
     \"\"\"Spacing and rhythm system\"\"\"
     base_unit: str = Field(description="Base spacing unit")
     scale: Dict[str, str] = Field(description="Spacing scale")
     padding_system: Dict[str, str] = Field(description="Padding values")
     margin_system: Dict[str, str] = Field(description="Margin values")
 
-class ComponentStyles(BaseModel):
+class ComponentStyles(FrozenModel):
     \"\"\"Component style definitions\"\"\"
     buttons: Dict[str, str] = Field(description="Button styles")
     inputs: Dict[str, str] = Field(description="Input field styles")
@@ -300,14 +305,14 @@ class ComponentStyles(BaseModel):
     border_radius: Dict[str, str] = Field(description="Border radius scale")
     shadows: Dict[str, str] = Field(description="Shadow/elevation system")
 
-class ImageryStyle(BaseModel):
+class ImageryStyle(FrozenModel):
     \"\"\"Imagery and visual style\"\"\"
     photography_style: Optional[str] = Field(default=None)
     illustration_style: str = Field(description="Illustration approach")
     icon_style: str = Field(description="Icon style")
     image_treatment: str = Field(description="Image processing")
 
-class DesignTheme(BaseModel):
+class DesignTheme(FrozenModel):
     \"\"\"Complete design theme specification\"\"\"
     theme_name: str
     description: str
@@ -318,7 +323,7 @@ class DesignTheme(BaseModel):
     components: ComponentStyles
     imagery: ImageryStyle
 
-class SimilarApp(BaseModel):
+class SimilarApp(FrozenModel):
     \"\"\"Similar app analysis\"\"\"
     app_name: str
     design_characteristics: str
@@ -326,6 +331,11 @@ class SimilarApp(BaseModel):
     layout_approach: str
     typography_style: str
     unique_elements: str
+
+# Validate a whole parsed response in one call instead of constructing
+# models item by item
+SimilarAppList = TypeAdapter(List[SimilarApp])
+DesignThemeList = TypeAdapter(List[DesignTheme])
 """
 
 # ============================================================================
@@ -336,29 +346,68 @@ LLM_PY = """
 from langchain_google_genai import ChatGoogleGenerativeAI
 from config.settings import settings
 import google.generativeai as genai
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+
+CACHE_DIR = Path(".llm_cache")
 
 def initialize_gemini():
     \"\"\"Initialize Google Gemini API\"\"\"
     genai.configure(api_key=settings.GOOGLE_API_KEY)
 
+@lru_cache(maxsize=4)
 def get_llm(temperature: float = None) -> ChatGoogleGenerativeAI:
     \"\"\"
     Initialize and return Gemini LLM instance
-    
+
+    Every node calls this on entry, so the instance is cached per
+    temperature: one client, one connection pool per process.
+
     Args:
         temperature: Override default temperature
-        
+
     Returns:
         ChatGoogleGenerativeAI instance
     \"\"\"
     initialize_gemini()
-    
+
     return ChatGoogleGenerativeAI(
         model=settings.GEMINI_MODEL,
         temperature=temperature or settings.GEMINI_TEMPERATURE,
         google_api_key=settings.GOOGLE_API_KEY,
         convert_system_message_to_human=True  # Gemini-specific
     )
+
+def invoke_cached(llm, messages) -> str:
+    \"\"\"
+    Invoke the LLM with an on-disk exact-match response cache
+
+    Responses are stored under SHA-256(model + prompt), so repeated
+    runs with identical prompts skip the Gemini round trip.
+
+    Args:
+        llm: ChatGoogleGenerativeAI instance
+        messages: LangChain message list
+
+    Returns:
+        Response content string
+    \"\"\"
+    prompt = "\\x00".join(m.content for m in messages)
+    key = hashlib.sha256(
+        (settings.GEMINI_MODEL + "\\x00" + prompt).encode("utf-8")
+    ).hexdigest()
+    path = CACHE_DIR / (key + ".json")
+    if path.is_file():
+        try:
+            return json.loads(path.read_text())["response"]
+        except (json.JSONDecodeError, KeyError, OSError):
+            pass  # treat a corrupt entry as a miss
+    response = llm.invoke(messages)
+    CACHE_DIR.mkdir(exist_ok=True)
+    path.write_text(json.dumps({"response": response.content}))
+    return response.content
 """
 
 # ============================================================================
@@ -368,50 +417,81 @@ def get_llm(temperature: float = None) -> ChatGoogleGenerativeAI:
 JSON_PARSER_PY = """
 import json
 import re
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
+# Compiled once at import; re.sub with a string pattern re-checks the
+# pattern cache on every call
+_CODE_FENCE_RE = re.compile(r'```(?:json)?\\s*')
+_TRAILING_COMMA_OBJ_RE = re.compile(r',\\s*}')
+_TRAILING_COMMA_ARR_RE = re.compile(r',\\s*]')
+
 def extract_json_from_text(text: str) -> Optional[Dict]:
     \"\"\"
     Extract JSON from text that might contain markdown or other formatting
-    
+
+    Walks the text once, tracking brace depth and string/escape state,
+    and tries each balanced top-level {...} span as a candidate. This
+    replaces the old backtracking regex, which rescanned the text per
+    nesting level and missed objects nested deeper than one brace.
+
     Args:
         text: Text that may contain JSON
-        
+
     Returns:
         Parsed JSON dict or None
     \"\"\"
     # Remove markdown code blocks
-    text = re.sub(r'```json\\s*', '', text)
-    text = re.sub(r'```\\s*', '', text)
-    
-    # Try to find JSON object
-    json_pattern = r'\\{[^{}]*(?:\\{[^{}]*\\}[^{}]*)*\\}'
-    matches = re.findall(json_pattern, text, re.DOTALL)
-    
-    for match in matches:
-        try:
-            return json.loads(match)
-        except json.JSONDecodeError:
+    text = _CODE_FENCE_RE.sub('', text)
+
+    start = depth = 0
+    in_string = escaped = False
+    for i, ch in enumerate(text):
+        if escaped:
+            escaped = False
+        elif ch == '\\\\':
+            escaped = in_string
+        elif ch == '\"':
+            in_string = not in_string
+        elif in_string:
             continue
-    
+        elif ch == '{':
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == '}' and depth:
+            depth -= 1
+            if depth == 0:
+                try:
+                    return json.loads(text[start:i + 1])
+                except json.JSONDecodeError:
+                    continue
+
     # Try direct parse
     try:
         return json.loads(text)
     except json.JSONDecodeError:
         return None
 
+# str hashes on content, so identical response texts (cache hits, retries
+# that returned the same body) parse once per process. Callers treat the
+# parsed object as read-only; every node copies values into state.
+_extract_cached = lru_cache(maxsize=128)(extract_json_from_text)
+
 def safe_json_parse(text: str, default: Any = None) -> Any:
     \"\"\"
     Safely parse JSON with fallback
-    
+
+    Memoized on the text content; do not mutate the returned object.
+
     Args:
         text: JSON string
         default: Default value if parsing fails
-        
+
     Returns:
         Parsed JSON or default value
     \"\"\"
-    result = extract_json_from_text(text)
+    result = _extract_cached(text)
     return result if result is not None else default
 
 def clean_json_string(text: str) -> str:
@@ -426,9 +506,9 @@ def clean_json_string(text: str) -> str:
     \"\"\"
     # Remove common issues
     text = text.strip()
-    text = re.sub(r',\\s*}', '}', text)  # Remove trailing commas
-    text = re.sub(r',\\s*]', ']', text)  # Remove trailing commas in arrays
-    
+    text = _TRAILING_COMMA_OBJ_RE.sub('}', text)  # Remove trailing commas
+    text = _TRAILING_COMMA_ARR_RE.sub(']', text)  # Remove trailing commas in arrays
+
     return text
 """
 
@@ -438,8 +518,47 @@ def clean_json_string(text: str) -> str:
 
 FORMATTERS_PY = """
 import json
+from functools import lru_cache
+from io import StringIO
+from operator import itemgetter
 from typing import Dict, Any, List
 
+# One C-level multi-key fetch for the six theme sections, instead of six
+# chained dict.get calls per theme
+_SECTION_KEYS = ('layout_types', 'color_palette', 'typography',
+                 'spacing', 'components', 'imagery')
+_EMPTY_SECTIONS = {key: {} for key in _SECTION_KEYS}
+_get_sections = itemgetter(*_SECTION_KEYS)
+
+# orjson serializes the big raw-JSON block several times faster than the
+# stdlib; fall back transparently when it is not installed
+try:
+    import orjson
+
+    def _dumps_indented(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    def _dumps_indented(obj) -> str:
+        return json.dumps(obj, indent=2)
+
+# One encoder instance for the per-row dumps: json.dumps constructs and
+# configures a fresh JSONEncoder on every call
+_ENCODER = json.JSONEncoder()
+
+# C-level character table beats the scan-and-copy of str.replace
+_UNDERSCORE_TO_SPACE = str.maketrans('_', ' ')
+
+@lru_cache(maxsize=256)
+def _label(key: str) -> str:
+    \"\"\"Turn a snake_case key into a display label; the same handful of
+    theme keys repeat for every theme, so the transform is memoized\"\"\"
+    return key.translate(_UNDERSCORE_TO_SPACE).title()
+
+@lru_cache(maxsize=None)
+def _prefix(indent: int) -> str:
+    \"\"\"Tree prefixes recur for every row at a depth; build each once\"\"\"
+    return "|   " * indent
+
 def format_theme_presentation(themes: List[Dict[str, Any]]) -> str:
     \"\"\"
     Format themes using | and # for presentation
@@ -450,77 +569,78 @@ def format_theme_presentation(themes: List[Dict[str, Any]]) -> str:
     Returns:
         Formatted string with themes
     \"\"\"
-    presentation = "\\n\\n" + "="*80 + "\\n"
-    presentation += "🎨 DESIGN THEME OPTIONS\\n"
-    presentation += "="*80 + "\\n\\n"
-    
+    # Stream lines into one growable buffer; unlike list + join, the text
+    # is never held twice (once as fragments, once assembled)
+    buf = StringIO()
+    out = buf.write
+    out("\\n\\n" + "="*80 + "\\n")
+    out("🎨 DESIGN THEME OPTIONS\\n")
+    out("="*80 + "\\n\\n")
+
     for idx, theme in enumerate(themes, 1):
-        presentation += f"{'#'*80}\\n"
-        presentation += f"# THEME {idx}: {theme.get('theme_name', f'Theme {idx}').upper()}\\n"
-        presentation += f"# {theme.get('description', '')}\\n"
-        presentation += f"{'#'*80}\\n\\n"
-        
+        out(f"{'#'*80}\\n")
+        out(f"# THEME {idx}: {theme.get('theme_name', f'Theme {idx}').upper()}\\n")
+        out(f"# {theme.get('description', '')}\\n")
+        out(f"{'#'*80}\\n\\n")
+
+        layout, colors, typo, spacing, components, imagery = \\
+            _get_sections({**_EMPTY_SECTIONS, **theme})
+
         # Layout Types
-        presentation += "## 📐 LAYOUT TYPES\\n"
-        presentation += "-" * 80 + "\\n"
-        layout = theme.get('layout_types', {})
+        out("## 📐 LAYOUT TYPES\\n")
+        out("-" * 80 + "\\n")
         for key, value in layout.items():
-            presentation += f"| {key.replace('_', ' ').title():<30} | {value}\\n"
-        
+            out(f"| {_label(key):<30} | {value}\\n")
+
         # Color Palette
-        presentation += "\\n## 🎨 COLOR PALETTE\\n"
-        presentation += "-" * 80 + "\\n"
-        colors = theme.get('color_palette', {})
+        out("\\n## 🎨 COLOR PALETTE\\n")
+        out("-" * 80 + "\\n")
         for key, value in colors.items():
             if isinstance(value, list):
-                presentation += f"| {key.replace('_', ' ').title():<30} | {', '.join(value)}\\n"
+                out(f"| {_label(key):<30} | {', '.join(value)}\\n")
             else:
-                presentation += f"| {key.replace('_', ' ').title():<30} | {value}\\n"
-        
+                out(f"| {_label(key):<30} | {value}\\n")
+
         # Typography
-        presentation += "\\n## 🔤 TYPOGRAPHY\\n"
-        presentation += "-" * 80 + "\\n"
-        typo = theme.get('typography', {})
+        out("\\n## 🔤 TYPOGRAPHY\\n")
+        out("-" * 80 + "\\n")
         for key, value in typo.items():
             if isinstance(value, dict):
-                presentation += f"| {key.replace('_', ' ').title():<30} | {json.dumps(value)}\\n"
+                out(f"| {_label(key):<30} | {_ENCODER.encode(value)}\\n")
             else:
-                presentation += f"| {key.replace('_', ' ').title():<30} | {value}\\n"
-        
+                out(f"| {_label(key):<30} | {value}\\n")
+
         # Spacing
-        presentation += "\\n## 📏 SPACING SCALE\\n"
-        presentation += "-" * 80 + "\\n"
-        spacing = theme.get('spacing', {})
+        out("\\n## 📏 SPACING SCALE\\n")
+        out("-" * 80 + "\\n")
         for key, value in spacing.items():
             if isinstance(value, dict):
                 vals = ', '.join([f"{k}: {v}" for k, v in value.items()])
-                presentation += f"| {key.replace('_', ' ').title():<30} | {vals}\\n"
+                out(f"| {_label(key):<30} | {vals}\\n")
             else:
-                presentation += f"| {key.replace('_', ' ').title():<30} | {value}\\n"
-        
+                out(f"| {_label(key):<30} | {value}\\n")
+
         # Components
-        presentation += "\\n## 🧩 COMPONENT STYLES\\n"
-        presentation += "-" * 80 + "\\n"
-        components = theme.get('components', {})
+        out("\\n## 🧩 COMPONENT STYLES\\n")
+        out("-" * 80 + "\\n")
         for key, value in components.items():
             if isinstance(value, dict):
-                presentation += f"| {key.replace('_', ' ').title():<30} |\\n"
+                out(f"| {_label(key):<30} |\\n")
                 for k, v in value.items():
-                    presentation += f"|   • {k:<26} | {v}\\n"
+                    out(f"|   • {k:<26} | {v}\\n")
             else:
-                presentation += f"| {key.replace('_', ' ').title():<30} | {value}\\n"
-        
+                out(f"| {_label(key):<30} | {value}\\n")
+
         # Imagery
-        presentation += "\\n## 🖼️ IMAGERY STYLE\\n"
-        presentation += "-" * 80 + "\\n"
-        imagery = theme.get('imagery', {})
+        out("\\n## 🖼️ IMAGERY STYLE\\n")
+        out("-" * 80 + "\\n")
         for key, value in imagery.items():
             if value:
-                presentation += f"| {key.replace('_', ' ').title():<30} | {value}\\n"
-        
-        presentation += "\\n" + "="*80 + "\\n\\n"
-    
-    return presentation
+                out(f"| {_label(key):<30} | {value}\\n")
+
+        out("\\n" + "="*80 + "\\n\\n")
+
+    return buf.getvalue()
 
 def format_final_json(final: Dict[str, Any]) -> str:
     \"\"\"
@@ -532,40 +652,46 @@ def format_final_json(final: Dict[str, Any]) -> str:
     Returns:
         Formatted string
     \"\"\"
-    output = "\\n\\n" + "#"*80 + "\\n"
-    output += "# 🎯 FINAL DESIGN SPECIFICATION\\n"
-    output += "#"*80 + "\\n\\n"
-    
-    def format_dict(d: Dict, indent: int = 0) -> str:
-        result = ""
+    # All levels of the recursion write into one shared buffer, so each
+    # line costs a single write regardless of nesting depth
+    buf = StringIO()
+    out = buf.write
+    out("\\n\\n" + "#"*80 + "\\n")
+    out("# 🎯 FINAL DESIGN SPECIFICATION\\n")
+    out("#"*80 + "\\n\\n")
+
+    def format_dict(d: Dict, indent: int = 0) -> None:
         for key, value in d.items():
-            prefix = "|   " * indent
+            prefix = _prefix(indent)
             if isinstance(value, dict):
-                result += f"{prefix}| {key.upper()}:\\n"
-                result += format_dict(value, indent + 1)
+                out(f"{prefix}| {key.upper()}:\\n")
+                format_dict(value, indent + 1)
             elif isinstance(value, list):
-                result += f"{prefix}| {key.upper()}:\\n"
-                for item in value:
-                    if isinstance(item, dict):
-                        result += format_dict(item, indent + 1)
-                    else:
-                        result += f"{prefix}|   • {item}\\n"
+                out(f"{prefix}| {key.upper()}:\\n")
+                # Lists are homogeneous in practice (all dicts or all
+                # scalars), so decide once and skip the per-item check
+                if value and all(isinstance(item, dict) for item in value):
+                    for item in value:
+                        format_dict(item, indent + 1)
+                else:
+                    bullet = f"{prefix}|   • "
+                    for item in value:
+                        out(f"{bullet}{item}\\n")
             else:
-                result += f"{prefix}| {key.upper():<35} | {value}\\n"
-        return result
-    
-    output += format_dict(final)
-    output += "\\n" + "#"*80 + "\\n"
-    
+                out(f"{prefix}| {key.upper():<35} | {value}\\n")
+
+    format_dict(final)
+    out("\\n" + "#"*80 + "\\n")
+
     # Add raw JSON
-    output += "\\n## 📄 RAW JSON OUTPUT:\\n"
-    output += "=" * 80 + "\\n"
-    output += "```json\\n"
-    output += json.dumps(final, indent=2)
-    output += "\\n```\\n"
-    output += "=" * 80 + "\\n"
-    
-    return output
+    out("\\n## 📄 RAW JSON OUTPUT:\\n")
+    out("=" * 80 + "\\n")
+    out("```json\\n")
+    out(_dumps_indented(final))
+    out("\\n```\\n")
+    out("=" * 80 + "\\n")
+
+    return buf.getvalue()
 
 def format_apps_list(apps: List[Dict[str, Any]]) -> str:
     \"\"\"Format similar apps list\"\"\"
@@ -627,24 +753,17 @@ Return exactly 5 apps in this format. Ensure all hex codes are valid.
 
 THEME_PROMPTS_PY = """
 import json
+import sys
 
-def get_theme_creation_prompt(user_input: str, similar_apps: list) -> str:
-    \"\"\"
-    Generate prompt for theme creation
-    
-    Args:
-        user_input: User's app description
-        similar_apps: List of analyzed similar apps
-        
-    Returns:
-        Formatted prompt string
-    \"\"\"
-    return f\"\"\"You are an expert UI/UX designer creating comprehensive design systems.
+# Templates are built once at import time; the builders below only run
+# format_map to splice in the dynamic values. sys.intern keeps a single
+# canonical copy of each multi-KB template alive for the process.
+_THEME_PROMPT_TEMPLATE = sys.intern(\"\"\"You are an expert UI/UX designer creating comprehensive design systems.
 
 USER REQUEST: "{user_input}"
 
 SIMILAR APPS ANALYSIS:
-{json.dumps(similar_apps, indent=2)}
+{similar_apps_json}
 
 Create 2 DISTINCT design themes. Make Theme 1 modern/bold/vibrant and Theme 2 classic/elegant/refined.
 
@@ -750,16 +869,14 @@ Structure (follow EXACTLY):
 }}
 
 Provide exactly 2 themes. Ensure all values are detailed and specific.
-\"\"\"
+\"\"\")
 
-def get_final_spec_prompt(user_input: str, selected_theme: dict, preferences: str) -> str:
-    \"\"\"Generate prompt for final specification\"\"\"
-    return f\"\"\"You are a design system architect creating production-ready specifications.
+_FINAL_SPEC_TEMPLATE = sys.intern(\"\"\"You are a design system architect creating production-ready specifications.
 
 APP REQUEST: "{user_input}"
 
 SELECTED THEME:
-{json.dumps(selected_theme, indent=2)}
+{selected_theme_json}
 
 USER PREFERENCES: "{preferences}"
 
@@ -787,7 +904,32 @@ You MUST respond with ONLY valid JSON. Structure:
 }}
 
 Make it comprehensive and ready for development.
-\"\"\"
+\"\"\")
+
+def get_theme_creation_prompt(user_input: str, similar_apps_json: str) -> str:
+    \"\"\"
+    Generate prompt for theme creation
+
+    Args:
+        user_input: User's app description
+        similar_apps_json: Pre-serialized similar-apps analysis; callers
+            serialize once and reuse the string across retries/rebuilds
+
+    Returns:
+        Formatted prompt string
+    \"\"\"
+    return _THEME_PROMPT_TEMPLATE.format_map({
+        'user_input': user_input,
+        'similar_apps_json': similar_apps_json
+    })
+
+def get_final_spec_prompt(user_input: str, selected_theme: dict, preferences: str) -> str:
+    \"\"\"Generate prompt for final specification\"\"\"
+    return _FINAL_SPEC_TEMPLATE.format_map({
+        'user_input': user_input,
+        'selected_theme_json': json.dumps(selected_theme, indent=2),
+        'preferences': preferences
+    })
 """
 
 # ============================================================================
@@ -796,7 +938,7 @@ Make it comprehensive and ready for development.
 
 SEARCH_APPS_PY = """
 from langchain_core.messages import HumanMessage, SystemMessage
-from src.utils.llm import get_llm
+from src.utils.llm import get_llm, invoke_cached
 from src.utils.json_parser import safe_json_parse
 from src.agents.state import AgentState
 from src.prompts.search_prompts import get_app_search_prompt
@@ -821,8 +963,8 @@ def search_similar_apps(state: AgentState) -> AgentState:
     ]
     
     try:
-        response = llm.invoke(messages)
-        similar_apps = safe_json_parse(response.content, default=[])
+        content = invoke_cached(llm, messages)
+        similar_apps = safe_json_parse(content, default=[])
         
         # Validate we got a list
         if not isinstance(similar_apps, list):
@@ -847,8 +989,10 @@ def search_similar_apps(state: AgentState) -> AgentState:
 # ============================================================================
 
 CREATE_THEMES_PY = """
+import json
+
 from langchain_core.messages import HumanMessage
-from src.utils.llm import get_llm
+from src.utils.llm import get_llm, invoke_cached
 from src.utils.json_parser import safe_json_parse
 from src.agents.state import AgentState
 from src.prompts.theme_prompts import get_theme_creation_prompt
@@ -864,17 +1008,18 @@ def create_design_themes(state: AgentState) -> AgentState:
         Updated state with design themes
     \"\"\"
     llm = get_llm()
-    
+
+    # Serialize the analysis once; the prompt builder takes the string
     prompt = get_theme_creation_prompt(
         state['user_input'],
-        state['similar_apps']
+        json.dumps(state['similar_apps'], indent=2)
     )
     
     messages = [HumanMessage(content=prompt)]
     
     try:
-        response = llm.invoke(messages)
-        themes_data = safe_json_parse(response.content, default={"themes": []})
+        content = invoke_cached(llm, messages)
+        themes_data = safe_json_parse(content, default={"themes": []})
         
         design_themes = themes_data.get('themes', [])
         
@@ -917,9 +1062,11 @@ def present_themes(state: AgentState) -> AgentState:
     themes = state['design_themes']
     
     if themes:
-        presentation = format_theme_presentation(themes)
-        state['messages'].append(presentation)
-        state['messages'].append("✅ Step 3: Themes presented to user")
+        # One extend: a single capacity check instead of one per append
+        state['messages'].extend([
+            format_theme_presentation(themes),
+            "✅ Step 3: Themes presented to user",
+        ])
     else:
         state['messages'].append("⚠️ No themes available to present")
     
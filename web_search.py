@@ -1,8 +1,19 @@
 ## Use DuckDuckGo
 ## Get List of DATA
 
+from functools import lru_cache
+
 from langchain_community.tools import DuckDuckGoSearchResults
 
-search = DuckDuckGoSearchResults(output_format="list", timeout=20)  # 20 seconds
-result = search.run("Mobile Apps Food Delivery")
-print(result)
+@lru_cache(maxsize=1)
+def get_search() -> DuckDuckGoSearchResults:
+    """Build the DuckDuckGo tool once per process and reuse it"""
+    return DuckDuckGoSearchResults(output_format="list", timeout=20)  # 20 seconds
+
+def search_apps(query: str) -> list:
+    """Run a search through the shared tool instance"""
+    return get_search().run(query)
+
+if __name__ == "__main__":
+    result = search_apps("Mobile Apps Food Delivery")
+    print(result)